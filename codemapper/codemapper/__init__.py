@@ -1,5 +1,5 @@
 from codemapper.utils import GitignoreSpec, ShadowFS
-from codemapper.processor import CodeParser, HashCache, WorkQueue
+from codemapper.processor import CodeParser, HashCache, SummaryCache, WorkQueue
 from codemapper.llm import OllamaClient
 from codemapper.store import Store, Job, Codebase, JobStatus
 from codemapper.scheduler import Scheduler
@@ -10,6 +10,7 @@ __all__ = [
     "ShadowFS",
     "CodeParser",
     "HashCache",
+    "SummaryCache",
     "WorkQueue",
     "OllamaClient",
     "Store",
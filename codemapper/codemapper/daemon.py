@@ -1,15 +1,20 @@
 import asyncio
-import json
+import itertools
+import multiprocessing
 import os
+import secrets
 import time
-import uuid
+from collections.abc import AsyncIterator, Iterator
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
 
+import orjson
+
 from codemapper.store import Store, JobStatus
 from codemapper.scheduler import Scheduler
-from codemapper.processor.parser import CodeParser
-from codemapper.processor.cache import HashCache
+from codemapper.processor.parser import KIND_TITLES, CodeParser, Symbol, extract_symbols
+from codemapper.processor.cache import HashCache, SummaryCache
 from codemapper.llm.client import OllamaClient, ModelConfig
 from codemapper.utils.gitignore import GitignoreSpec
 from codemapper.utils.file_ops import ShadowFS
@@ -17,6 +22,48 @@ from codemapper.utils.file_ops import ShadowFS
 
 SOCKET_PATH = Path("/tmp/codemapper.sock")
 PID_FILE = Path.home() / ".codemapper" / "daemon.pid"
+PROGRESS_EVERY = 100
+SCAN_BATCH = 256
+MAX_SUMMARY_CACHE = int(os.environ.get("MAX_SUMMARY_CACHE", "50000"))
+
+
+async def _read_message(reader: asyncio.StreamReader) -> dict[str, Any]:
+    header = await reader.readexactly(4)
+    body = await reader.readexactly(int.from_bytes(header, "big"))
+    return orjson.loads(body)
+
+
+def _write_message(writer: asyncio.StreamWriter, message: dict[str, Any]) -> None:
+    payload = orjson.dumps(message)
+    writer.write(len(payload).to_bytes(4, "big") + payload)
+
+
+def _next_sources(
+    entries: Iterator[os.DirEntry[str]], parser: CodeParser
+) -> list[tuple[Path, str, os.stat_result]] | None:
+    batch = list(itertools.islice(entries, SCAN_BATCH))
+    if not batch:
+        return None
+    source_files: list[tuple[Path, str, os.stat_result]] = []
+    for entry in batch:
+        file_path = Path(entry.path)
+        lang = parser.detect_language(file_path)
+        if not lang:
+            continue
+        try:
+            source_files.append((file_path, lang, entry.stat()))
+        except OSError:
+            continue
+    return source_files
+
+
+async def _iter_sources(
+    extensions: set[str], gitignore: GitignoreSpec, parser: CodeParser
+) -> AsyncIterator[tuple[Path, str, os.stat_result]]:
+    entries = gitignore.walk(extensions)
+    while (source_files := await asyncio.to_thread(_next_sources, entries, parser)) is not None:
+        for source in source_files:
+            yield source
 
 
 class MapperEngine:
@@ -24,8 +71,17 @@ class MapperEngine:
         self._store = store
         self._ollama = ollama
         self._parser = CodeParser()
+        self._concurrency = int(os.environ.get("OLLAMA_NUM_PARALLEL", "4"))
+        self._parse_workers = os.cpu_count() or 1
+        self._parse_pool = ProcessPoolExecutor(
+            max_workers=self._parse_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
         self._running_scans: set[str] = set()
 
+    def close(self) -> None:
+        self._parse_pool.shutdown(wait=False, cancel_futures=True)
+
     def is_scanning(self, name: str) -> bool:
         return name in self._running_scans
 
@@ -34,7 +90,16 @@ class MapperEngine:
             return 0, 0
 
         self._running_scans.add(name)
-        job_id = str(uuid.uuid4())[:8]
+        job_id = secrets.token_hex(4)
+        cache: HashCache | None = None
+        summaries: SummaryCache | None = None
+        writer: ThreadPoolExecutor | None = None
+        inflight: dict[str, asyncio.Task[str]] = {}
+        parse_tasks: list[asyncio.Task[None]] = []
+        file_tasks: list[asyncio.Task[None]] = []
+        known: dict[str, str] = {}
+        files_processed = 0
+        symbols_processed = 0
 
         try:
             await self._store.create_job(job_id, codebase_id, name)
@@ -42,65 +107,123 @@ class MapperEngine:
             gitignore = GitignoreSpec(path)
             shadow = ShadowFS(path)
             cache = HashCache(path)
+            summaries = SummaryCache(path, max_entries=MAX_SUMMARY_CACHE)
+            writer = ThreadPoolExecutor(max_workers=1)
             extensions = {".py", ".js", ".ts", ".tsx", ".rs", ".go"}
 
-            files_processed = 0
-            symbols_processed = 0
-
             await self._store.add_log(job_id, f"Starting scan of {path}")
 
-            if not self._ollama.is_available():
+            if not await self._ollama.is_available_async():
                 await self._store.add_log(job_id, "Ollama not available - skipping LLM summaries", "warn")
                 await self._store.update_job(job_id, JobStatus.FAILED, 0, 0, "Ollama not available")
                 return 0, 0
 
-            source_files: list[Path] = []
-            for file_path in path.rglob("*"):
-                if file_path.is_dir():
-                    continue
-                if file_path.suffix not in extensions:
-                    continue
-                if gitignore.matches(file_path):
-                    continue
-                lang = self._parser.detect_language(file_path)
-                if lang:
-                    source_files.append(file_path)
+            loop = asyncio.get_running_loop()
+            sem = asyncio.Semaphore(self._concurrency)
 
-            await self._store.add_log(job_id, f"Found {len(source_files)} source files")
-
-            for file_path in source_files:
+            async def summarize(file_path: Path, symbol: Symbol, code_hash: str) -> str:
+                try:
+                    async with sem:
+                        await self._store.add_log(job_id, f"Processing {symbol.name} in {file_path.name}")
+                        result = await self._ollama.summarize_async(symbol)
+                except Exception as e:
+                    await self._store.add_log(job_id, f"LLM error for {symbol.name}: {e}", "error")
+                    raise
+                known[code_hash] = result
+                summaries.put(code_hash, result)
+                return result
+
+            async def finish_file(
+                file_path: Path, changed: list[tuple[Symbol, str, str]], state: tuple[int, int, str]
+            ) -> None:
+                nonlocal symbols_processed
+                sections: list[str] = []
+                done: list[tuple[str, str]] = []
+                complete = True
+                for symbol, symbol_id, code_hash in changed:
+                    summary = known.get(code_hash)
+                    if summary is None:
+                        try:
+                            summary = await inflight[code_hash]
+                        except Exception:
+                            complete = False
+                            continue
+                    sections.append(f"## {KIND_TITLES[symbol.kind]}: {symbol.name}\n\n{summary}")
+                    done.append((symbol_id, code_hash))
+
+                if sections:
+                    map_content = f"# {file_path.name}\n\n" + "\n\n---\n\n".join(sections)
+                    try:
+                        await loop.run_in_executor(writer, shadow.write_map, file_path, map_content)
+                    except OSError as e:
+                        await self._store.add_log(job_id, f"Error processing {file_path.name}: {e}", "error")
+                        return
+
+                now = time.time()
+                for symbol_id, code_hash in done:
+                    cache.update(symbol_id, code_hash, now)
+                symbols_processed += len(done)
+                if complete:
+                    mtime_ns, size, content_hash = state
+                    cache.update_file(str(file_path), mtime_ns, size, content_hash)
+
+            files_skipped = 0
+            parse_sem = asyncio.Semaphore(self._parse_workers * 2)
+
+            async def parse_file(file_path: Path, lang: str, st: os.stat_result) -> None:
+                nonlocal files_processed, files_skipped
                 try:
-                    lang = self._parser.detect_language(file_path)
-                    if not lang:
-                        continue
+                    content = await asyncio.to_thread(file_path.read_bytes)
+                    content_hash = HashCache.compute_hash(content)
+                    if cache.file_unchanged(str(file_path), st.st_mtime_ns, st.st_size, content_hash):
+                        cache.update_file(str(file_path), st.st_mtime_ns, st.st_size, content_hash)
+                        files_skipped += 1
+                        return
 
-                    content = file_path.read_text()
-                    symbols = self._parser.extract_symbols(content, lang)
+                    symbols = await loop.run_in_executor(self._parse_pool, extract_symbols, content, lang)
 
-                    file_summaries: list[str] = []
+                    changed: list[tuple[Symbol, str, str]] = []
                     for symbol in symbols:
                         symbol_id = f"{file_path}::{symbol.name}"
                         code_hash = HashCache.compute_hash(symbol.code)
-
-                        if cache.is_changed(symbol_id, code_hash):
-                            await self._store.add_log(job_id, f"Processing {symbol.name} in {file_path.name}")
-                            try:
-                                summary = await self._ollama.summarize_async(symbol)
-                                file_summaries.append(f"## {symbol.kind.value.capitalize()}: {symbol.name}\n\n{summary}")
-                                cache.update(symbol_id, code_hash, time.time())
-                                symbols_processed += 1
-                            except Exception as e:
-                                await self._store.add_log(job_id, f"LLM error for {symbol.name}: {e}", "error")
-
-                    if file_summaries:
-                        map_content = f"# {file_path.name}\n\n" + "\n\n---\n\n".join(file_summaries)
-                        shadow.write_map(file_path, map_content)
-
+                        if not cache.is_changed(symbol_id, code_hash):
+                            continue
+                        changed.append((symbol, symbol_id, code_hash))
+                        if code_hash in known or code_hash in inflight:
+                            continue
+                        cached = summaries.get(code_hash)
+                        if cached is None:
+                            inflight[code_hash] = asyncio.create_task(summarize(file_path, symbol, code_hash))
+                        else:
+                            known[code_hash] = cached
+
+                    state = (st.st_mtime_ns, st.st_size, content_hash)
+                    file_tasks.append(asyncio.create_task(finish_file(file_path, changed, state)))
                     files_processed += 1
-                    cache.save()
+                    if files_processed % PROGRESS_EVERY == 0:
+                        await self._store.add_log(job_id, f"Parsed {files_processed} source files")
 
                 except Exception as e:
                     await self._store.add_log(job_id, f"Error processing {file_path.name}: {e}", "error")
+                finally:
+                    parse_sem.release()
+
+            async for file_path, lang, st in _iter_sources(extensions, gitignore, self._parser):
+                if cache.file_unchanged(str(file_path), st.st_mtime_ns, st.st_size):
+                    files_skipped += 1
+                    continue
+                await parse_sem.acquire()
+                parse_tasks.append(asyncio.create_task(parse_file(file_path, lang, st)))
+
+            await asyncio.gather(*parse_tasks)
+
+            await self._store.add_log(
+                job_id,
+                f"Found {files_processed} changed source files ({files_skipped} unchanged), "
+                f"{len(inflight)} symbols to summarize",
+            )
+
+            await asyncio.gather(*file_tasks)
 
             await self._store.update_job(job_id, JobStatus.COMPLETED, symbols_processed, files_processed)
             await self._store.add_log(job_id, f"Completed: {files_processed} files, {symbols_processed} symbols")
@@ -110,6 +233,15 @@ class MapperEngine:
             await self._store.add_log(job_id, f"Failed: {e}", "error")
 
         finally:
+            for task in (*parse_tasks, *file_tasks, *inflight.values()):
+                task.cancel()
+            await asyncio.gather(*parse_tasks, *file_tasks, *inflight.values(), return_exceptions=True)
+            if writer is not None:
+                await asyncio.to_thread(writer.shutdown)
+            if cache is not None:
+                await asyncio.to_thread(cache.close)
+            if summaries is not None:
+                await asyncio.to_thread(summaries.save)
             self._running_scans.discard(name)
 
         return files_processed, symbols_processed
@@ -121,7 +253,7 @@ class Daemon:
         self._scheduler = Scheduler()
         self._ollama = OllamaClient(ModelConfig())
         self._engine = MapperEngine(self._store, self._ollama)
-        self._running = False
+        self._stop_event = asyncio.Event()
         self._server: asyncio.Server | None = None
 
     async def start(self) -> None:
@@ -136,17 +268,21 @@ class Daemon:
             SOCKET_PATH.unlink()
 
         self._server = await asyncio.start_unix_server(self._handle_client, path=str(SOCKET_PATH))
-        self._running = True
 
         PID_FILE.parent.mkdir(parents=True, exist_ok=True)
         PID_FILE.write_text(str(os.getpid()))
 
+    async def wait_stopped(self) -> None:
+        await self._stop_event.wait()
+
     async def stop(self) -> None:
-        self._running = False
+        self._stop_event.set()
         self._scheduler.stop()
         if self._server:
             self._server.close()
             await self._server.wait_closed()
+        await self._store.close()
+        self._engine.close()
         if SOCKET_PATH.exists():
             SOCKET_PATH.unlink()
         if PID_FILE.exists():
@@ -159,11 +295,12 @@ class Daemon:
 
     async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
         try:
-            data = await reader.read(4096)
-            request = json.loads(data.decode())
+            request = await _read_message(reader)
             response = await self._process_command(request)
-            writer.write(json.dumps(response).encode())
+            _write_message(writer, response)
             await writer.drain()
+        except asyncio.IncompleteReadError:
+            pass
         finally:
             writer.close()
             await writer.wait_closed()
@@ -172,7 +309,12 @@ class Daemon:
         cmd = request.get("cmd", "")
 
         if cmd == "ping":
-            return {"ok": True, "message": "pong"}
+            return {
+                "ok": True,
+                "message": "pong",
+                "dropped_logs": self._store.dropped_logs,
+                "log_error": self._store.log_error,
+            }
 
         elif cmd == "scan":
             name = request.get("name", "")
@@ -184,13 +326,12 @@ class Daemon:
 
         elif cmd == "run":
             name = request.get("name", "")
-            codebases = await self._store.get_codebases()
-            for cb in codebases:
-                if cb.name == name:
-                    if self._engine.is_scanning(name):
-                        return {"ok": False, "message": f"Scan already running for {name}"}
-                    asyncio.create_task(self._engine.run_scan(cb.id, cb.name, Path(cb.path)))
-                    return {"ok": True, "message": f"Started scan for {name}"}
+            cb = await self._store.get_codebase_by_name(name)
+            if cb:
+                if self._engine.is_scanning(name):
+                    return {"ok": False, "message": f"Scan already running for {name}"}
+                asyncio.create_task(self._engine.run_scan(cb.id, cb.name, Path(cb.path)))
+                return {"ok": True, "message": f"Started scan for {name}"}
             return {"ok": False, "message": f"Codebase {name} not found. Use 'mapper list' to see registered codebases."}
 
         elif cmd == "run_once":
@@ -226,11 +367,9 @@ class Daemon:
             job_id = request.get("job_id", "")
             logs = await self._store.get_logs(job_id, request.get("limit", 100))
             if not logs:
-                jobs = await self._store.get_jobs(50)
-                for j in jobs:
-                    if j.codebase_name == job_id:
-                        logs = await self._store.get_logs(j.id, request.get("limit", 100))
-                        break
+                latest = await self._store.get_latest_job(job_id)
+                if latest:
+                    logs = await self._store.get_logs(latest.id, request.get("limit", 100))
             return {"ok": True, "logs": [
                 {"timestamp": l.timestamp, "level": l.level, "message": l.message}
                 for l in logs
@@ -250,7 +389,7 @@ class Daemon:
 
     async def _shutdown(self) -> None:
         await asyncio.sleep(0.5)
-        self._running = False
+        self._stop_event.set()
 
 
 class DaemonClient:
@@ -259,12 +398,12 @@ class DaemonClient:
         try:
             reader, writer = await asyncio.open_unix_connection(str(SOCKET_PATH))
             request = {"cmd": cmd, **kwargs}
-            writer.write(json.dumps(request).encode())
+            _write_message(writer, request)
             await writer.drain()
-            data = await reader.read(4096)
+            response = await _read_message(reader)
             writer.close()
             await writer.wait_closed()
-            return json.loads(data.decode())
+            return response
         except (ConnectionRefusedError, FileNotFoundError):
             return {"ok": False, "message": "Daemon not running. Start with: mapper serve"}
 
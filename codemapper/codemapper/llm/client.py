@@ -1,5 +1,11 @@
+import asyncio
+import time
+from collections.abc import AsyncGenerator
+from contextlib import aclosing
 from dataclasses import dataclass
+from typing import cast
 
+import httpx
 import ollama
 
 from codemapper.llm.prompts import SYSTEM_PROMPT, build_summarize_prompt
@@ -17,6 +23,14 @@ class OllamaClient:
     def __init__(self, config: ModelConfig | None = None) -> None:
         self._config = config or ModelConfig()
         self._client = ollama.Client()
+        self._async_client: ollama.AsyncClient | None = None
+        self._avail_checked_at: float = float("-inf")
+        self._avail: bool = False
+
+    def _aclient(self) -> ollama.AsyncClient:
+        if self._async_client is None:
+            self._async_client = ollama.AsyncClient()
+        return self._async_client
 
     def summarize(self, symbol: Symbol) -> str:
         prompt = build_summarize_prompt(symbol)
@@ -35,8 +49,8 @@ class OllamaClient:
 
     async def summarize_async(self, symbol: Symbol) -> str:
         prompt = build_summarize_prompt(symbol)
-        async_client = ollama.AsyncClient()
-        response = await async_client.chat(
+        async_client = self._aclient()
+        stream = await async_client.chat(
             model=self._config.name,
             messages=[
                 {"role": "system", "content": SYSTEM_PROMPT},
@@ -46,8 +60,13 @@ class OllamaClient:
                 "num_ctx": self._config.context_window,
                 "temperature": self._config.temperature,
             },
+            stream=True,
         )
-        return response.message.content or ""
+        parts: list[str] = []
+        async with aclosing(cast(AsyncGenerator[ollama.ChatResponse, None], stream)):
+            async for chunk in stream:
+                parts.append(chunk.message.content or "")
+        return "".join(parts).strip()
 
     def is_available(self) -> bool:
         try:
@@ -55,3 +74,14 @@ class OllamaClient:
             return True
         except Exception:
             return False
+
+    async def is_available_async(self, ttl: float = 30.0, timeout: float = 2.0) -> bool:
+        if time.monotonic() - self._avail_checked_at < ttl:
+            return self._avail
+        try:
+            await asyncio.wait_for(self._aclient().list(), timeout=timeout)
+            self._avail = True
+        except (OSError, TimeoutError, httpx.HTTPError, ollama.ResponseError):
+            self._avail = False
+        self._avail_checked_at = time.monotonic()
+        return self._avail
@@ -1,6 +1,7 @@
 import asyncio
 import os
 import sys
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Annotated
@@ -12,6 +13,12 @@ from rich.panel import Panel
 
 from codemapper.daemon import Daemon, DaemonClient, PID_FILE
 
+try:
+    import uvloop
+    loop_factory = uvloop.new_event_loop
+except ImportError:
+    loop_factory = None
+
 app = typer.Typer(
     name="mapper",
     help="CodeMapper - Local codebase mapping daemon with scheduled LLM-powered code summarization",
@@ -53,18 +60,17 @@ HELP_TEXT = """
 """
 
 
-def relative_time(iso_str: str | None) -> str:
-    if not iso_str:
+def relative_time(epoch_ms: int | None) -> str:
+    if not epoch_ms:
         return "never"
-    dt = datetime.fromisoformat(iso_str)
-    delta = datetime.now() - dt
-    if delta.days > 0:
-        return f"{delta.days}d ago"
-    if delta.seconds >= 3600:
-        return f"{delta.seconds // 3600}h ago"
-    if delta.seconds >= 60:
-        return f"{delta.seconds // 60}m ago"
-    return f"{delta.seconds}s ago"
+    seconds = max(0, int(time.time() - epoch_ms / 1000))
+    if seconds >= 86400:
+        return f"{seconds // 86400}d ago"
+    if seconds >= 3600:
+        return f"{seconds // 3600}h ago"
+    if seconds >= 60:
+        return f"{seconds // 60}m ago"
+    return f"{seconds}s ago"
 
 
 @app.command(help="Start the CodeMapper daemon")
@@ -94,18 +100,17 @@ def serve(
     async def run_daemon() -> None:
         await daemon.start()
         try:
-            while daemon._running:
-                await asyncio.sleep(0.5)
+            await daemon.wait_stopped()
         except asyncio.CancelledError:
             pass
         finally:
             await daemon.stop()
 
     try:
-        asyncio.run(run_daemon())
+        asyncio.run(run_daemon(), loop_factory=loop_factory)
     except KeyboardInterrupt:
         console.print("\n[yellow]Shutting down...[/yellow]")
-        asyncio.run(daemon.stop())
+        asyncio.run(daemon.stop(), loop_factory=loop_factory)
     console.print("[green]Daemon stopped[/green]")
 
 
@@ -266,7 +271,7 @@ def logs(
         return
 
     for log in logs_list:
-        ts = log["timestamp"].split("T")[1].split(".")[0]
+        ts = datetime.fromtimestamp(log["timestamp"] / 1000).strftime("%H:%M:%S")
         level = log["level"]
         level_style = "red" if level == "error" else "yellow" if level == "warn" else "dim"
         console.print(f"[dim]{ts}[/dim] [{level_style}]{level.upper():5}[/{level_style}] {log['message']}")
@@ -307,6 +312,11 @@ def status() -> None:
         if response["ok"]:
             pid = PID_FILE.read_text() if PID_FILE.exists() else "?"
             console.print(f"[green]●[/green] Daemon running (PID: {pid})")
+            if response.get("dropped_logs"):
+                console.print(
+                    f"[yellow]![/yellow] {response['dropped_logs']} log entries could not be saved: "
+                    f"{response['log_error']}"
+                )
             return
     console.print("[red]●[/red] Daemon not running")
 
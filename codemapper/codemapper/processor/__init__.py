@@ -1,11 +1,11 @@
 from codemapper.processor.parser import CodeParser, Symbol
-from codemapper.processor.cache import HashCache
+from codemapper.processor.cache import HashCache, SummaryCache
 from codemapper.processor.queue_manager import WorkQueue
 from codemapper.processor.imports import ImportExtractor, Import, ModuleImports
 from codemapper.processor.graph import DependencyGraph, ProjectAnalyzer, Cycle, DependencyStats
 
 __all__ = [
-    "CodeParser", "Symbol", "HashCache", "WorkQueue",
+    "CodeParser", "Symbol", "HashCache", "SummaryCache", "WorkQueue",
     "ImportExtractor", "Import", "ModuleImports",
     "DependencyGraph", "ProjectAnalyzer", "Cycle", "DependencyStats",
 ]
@@ -1,45 +1,138 @@
-import hashlib
-import json
+import os
+import sqlite3
+from collections import OrderedDict
 from pathlib import Path
-from typing import TypedDict
 
-
-class CacheEntry(TypedDict):
-    hash: str
-    timestamp: float
+import orjson
+import xxhash
 
 
 class HashCache:
-    def __init__(self, root: Path, lock_file: str = "mapper.lock") -> None:
-        self._lock_path = root / lock_file
-        self._cache: dict[str, CacheEntry] = self._load()
+    COMMIT_EVERY = 500
+    HASH_VERSION = 1
 
-    def _load(self) -> dict[str, CacheEntry]:
-        if self._lock_path.exists():
-            try:
-                return json.loads(self._lock_path.read_text())
-            except (json.JSONDecodeError, OSError):
-                return {}
-        return {}
+    def __init__(self, root: Path, db_file: str = ".codemapper/hashes.sqlite") -> None:
+        self._db_path = root / db_file
+        self._db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self._db_path, check_same_thread=False)
+        self._conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS symbols (
+                symbol_id TEXT PRIMARY KEY,
+                code_hash TEXT NOT NULL,
+                ts REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                content_hash TEXT NOT NULL
+            );
+        """)
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] != self.HASH_VERSION:
+            self._conn.executescript(f"""
+                DELETE FROM symbols;
+                DELETE FROM files;
+                PRAGMA user_version = {self.HASH_VERSION};
+            """)
+        self._uncommitted = 0
 
     def save(self) -> None:
-        self._lock_path.write_text(json.dumps(self._cache, indent=2))
+        self._conn.commit()
+        self._uncommitted = 0
+
+    def close(self) -> None:
+        self.save()
+        self._conn.close()
 
     @staticmethod
-    def compute_hash(code: str) -> str:
-        return hashlib.sha256(code.encode()).hexdigest()
+    def compute_hash(code: bytes | memoryview | str) -> str:
+        if isinstance(code, str):
+            code = code.encode()
+        return xxhash.xxh3_128_hexdigest(code)
 
     def is_changed(self, symbol_id: str, current_hash: str) -> bool:
-        entry = self._cache.get(symbol_id)
-        if not entry:
+        row = self._conn.execute("SELECT code_hash FROM symbols WHERE symbol_id = ?", (symbol_id,)).fetchone()
+        if not row:
             return True
-        return entry["hash"] != current_hash
+        return row[0] != current_hash
 
     def update(self, symbol_id: str, code_hash: str, timestamp: float) -> None:
-        self._cache[symbol_id] = {"hash": code_hash, "timestamp": timestamp}
+        self._conn.execute(
+            "INSERT OR REPLACE INTO symbols (symbol_id, code_hash, ts) VALUES (?, ?, ?)",
+            (symbol_id, code_hash, timestamp)
+        )
+        self._uncommitted += 1
+        if self._uncommitted >= self.COMMIT_EVERY:
+            self.save()
 
     def remove(self, symbol_id: str) -> None:
-        self._cache.pop(symbol_id, None)
+        self._conn.execute("DELETE FROM symbols WHERE symbol_id = ?", (symbol_id,))
+        self._uncommitted += 1
+
+    def file_unchanged(self, path: str, mtime_ns: int, size: int, content_hash: str | None = None) -> bool:
+        row = self._conn.execute(
+            "SELECT mtime_ns, size, content_hash FROM files WHERE path = ?", (path,)
+        ).fetchone()
+        if not row:
+            return False
+        if row[0] == mtime_ns and row[1] == size:
+            return True
+        return content_hash is not None and row[2] == content_hash
+
+    def update_file(self, path: str, mtime_ns: int, size: int, content_hash: str) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO files (path, mtime_ns, size, content_hash) VALUES (?, ?, ?, ?)",
+            (path, mtime_ns, size, content_hash)
+        )
+        self._uncommitted += 1
+        if self._uncommitted >= self.COMMIT_EVERY:
+            self.save()
 
     def get_all_keys(self) -> set[str]:
-        return set(self._cache.keys())
+        return {row[0] for row in self._conn.execute("SELECT symbol_id FROM symbols")}
+
+
+class SummaryCache:
+    def __init__(self, root: Path, cache_file: str = ".codemapper/summaries.json", max_entries: int = 50_000) -> None:
+        self._cache_path = root / cache_file
+        self._max_entries = max_entries
+        self._summaries: OrderedDict[str, str] = self._load()
+        self._dirty = False
+        self._evict()
+
+    def _load(self) -> OrderedDict[str, str]:
+        if self._cache_path.exists():
+            try:
+                return OrderedDict(orjson.loads(self._cache_path.read_bytes()))
+            except (orjson.JSONDecodeError, OSError):
+                return OrderedDict()
+        return OrderedDict()
+
+    def _evict(self) -> None:
+        while len(self._summaries) > self._max_entries:
+            self._summaries.popitem(last=False)
+            self._dirty = True
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        self._cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._cache_path.with_suffix(".tmp")
+        with open(tmp_path, "wb", buffering=1 << 20) as f:
+            f.write(orjson.dumps(self._summaries))
+        os.replace(tmp_path, self._cache_path)
+        self._dirty = False
+
+    def get(self, code_hash: str) -> str | None:
+        summary = self._summaries.get(code_hash)
+        if summary is not None:
+            self._summaries.move_to_end(code_hash)
+        return summary
+
+    def put(self, code_hash: str, summary: str) -> None:
+        self._summaries[code_hash] = summary
+        self._summaries.move_to_end(code_hash)
+        self._dirty = True
+        self._evict()
@@ -1,6 +1,18 @@
-from collections import defaultdict
+import bisect
+import functools
+import heapq
+import itertools
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
+from operator import itemgetter
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from codemapper.processor.imports import ImportExtractor
 
 
 @dataclass
@@ -24,62 +36,200 @@ class DependencyStats:
 
 class DependencyGraph:
     def __init__(self) -> None:
-        self._edges: dict[str, set[str]] = defaultdict(set)
-        self._reverse_edges: dict[str, set[str]] = defaultdict(set)
-        self._modules: set[str] = set()
-        self._external: set[str] = set()
+        self._ids: dict[str, int] = {}
+        self._names: list[str] = []
+        self._short_names: list[str] = []
+        self._sorted_modules: list[int] = []
+        self._adj: list[set[int]] = []
+        self._reverse_adj: list[list[int]] | None = None
+        self._is_module = bytearray()
+        self._is_external = bytearray()
+        self._import_counts: list[int] = []
+        self._module_count = 0
+        self._external_count = 0
+        self._total_imports = 0
+        self._cycles_cache: list[Cycle] = []
+        self._dirty = True
+
+    def _intern(self, name: str) -> int:
+        node = self._ids.get(name)
+        if node is None:
+            node = len(self._names)
+            self._ids[name] = node
+            self._names.append(name)
+            self._short_names.append(Path(name).stem if "/" in name or "\\" in name else name)
+            self._adj.append(set())
+            self._reverse_adj = None
+            self._is_module.append(0)
+            self._is_external.append(0)
+            self._import_counts.append(0)
+        return node
+
+    def _mark_module(self, node: int) -> None:
+        if not self._is_module[node]:
+            self._is_module[node] = 1
+            self._module_count += 1
+            bisect.insort(self._sorted_modules, node, key=self._names.__getitem__)
+            self._dirty = True
 
     def add_module(self, module: str) -> None:
-        self._modules.add(module)
+        self._mark_module(self._intern(module))
 
     def add_dependency(self, from_module: str, to_module: str, is_external: bool = False) -> None:
-        self._edges[from_module].add(to_module)
-        self._reverse_edges[to_module].add(from_module)
-        self._modules.add(from_module)
+        src = self._intern(from_module)
+        dst = self._intern(to_module)
+        deps = self._adj[src]
+        if dst not in deps:
+            deps.add(dst)
+            self._reverse_adj = None
+            self._import_counts[dst] += 1
+            self._total_imports += 1
+            self._dirty = True
+        self._mark_module(src)
         if is_external:
-            self._external.add(to_module)
+            if not self._is_external[dst]:
+                self._is_external[dst] = 1
+                self._external_count += 1
         else:
-            self._modules.add(to_module)
+            self._mark_module(dst)
+
+    def _module_ids(self) -> list[int]:
+        return [node for node, flag in enumerate(self._is_module) if flag]
 
     def get_dependencies(self, module: str) -> set[str]:
-        return self._edges.get(module, set())
+        node = self._ids.get(module)
+        if node is None:
+            return set()
+        return {self._names[dep] for dep in self._adj[node]}
+
+    def _ensure_reverse(self) -> list[list[int]]:
+        if self._reverse_adj is None:
+            reverse: list[list[int]] = [[] for _ in self._names]
+            for src, deps in enumerate(self._adj):
+                for dst in deps:
+                    reverse[dst].append(src)
+            self._reverse_adj = reverse
+        return self._reverse_adj
 
     def get_dependents(self, module: str) -> set[str]:
-        return self._reverse_edges.get(module, set())
+        node = self._ids.get(module)
+        if node is None:
+            return set()
+        return {self._names[dep] for dep in self._ensure_reverse()[node]}
 
     def find_cycles(self) -> list[Cycle]:
+        if self._dirty:
+            self._cycles_cache = self._compute_cycles()
+            self._dirty = False
+        return list(self._cycles_cache)
+
+    def _compute_cycles(self) -> list[Cycle]:
+        is_module = self._is_module
+        adjacency = [
+            [dep for dep in deps if is_module[dep]] if is_module[node] else []
+            for node, deps in enumerate(self._adj)
+        ]
+
+        if not self._has_cycle(adjacency):
+            return []
+
+        count = len(adjacency)
+        index = [-1] * count
+        lowlink = [0] * count
+        on_stack = bytearray(count)
+        component_stack: list[int] = []
+        seen_cycles: set[tuple[str, ...]] = set()
         cycles: list[Cycle] = []
-        visited: set[str] = set()
-        rec_stack: set[str] = set()
-        path: list[str] = []
-
-        def dfs(node: str) -> None:
-            visited.add(node)
-            rec_stack.add(node)
-            path.append(node)
+        counter = 0
 
-            for neighbor in self._edges.get(node, set()):
-                if neighbor not in self._modules:
-                    continue
-                if neighbor not in visited:
-                    dfs(neighbor)
-                elif neighbor in rec_stack:
-                    cycle_start = path.index(neighbor)
-                    cycle_nodes = path[cycle_start:]
-                    if len(cycle_nodes) > 1:
-                        normalized = self._normalize_cycle(cycle_nodes)
-                        if not any(c.nodes == normalized for c in cycles):
+        for root in range(count):
+            if index[root] != -1:
+                continue
+            index[root] = lowlink[root] = counter
+            counter += 1
+            component_stack.append(root)
+            on_stack[root] = 1
+            work = [(root, iter(adjacency[root]))]
+
+            while work:
+                node, neighbors = work[-1]
+                for neighbor in neighbors:
+                    if index[neighbor] == -1:
+                        index[neighbor] = lowlink[neighbor] = counter
+                        counter += 1
+                        component_stack.append(neighbor)
+                        on_stack[neighbor] = 1
+                        work.append((neighbor, iter(adjacency[neighbor])))
+                        break
+                    if on_stack[neighbor]:
+                        lowlink[node] = min(lowlink[node], index[neighbor])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[node])
+                    if lowlink[node] != index[node]:
+                        continue
+
+                    component: list[int] = []
+                    while True:
+                        member = component_stack.pop()
+                        on_stack[member] = 0
+                        component.append(member)
+                        if member == node:
+                            break
+
+                    if len(component) > 1:
+                        normalized = self._normalize_cycle(self._cycle_through(component, adjacency))
+                        key = tuple(normalized)
+                        if key not in seen_cycles:
+                            seen_cycles.add(key)
                             cycles.append(Cycle(nodes=normalized))
 
-            path.pop()
-            rec_stack.remove(node)
-
-        for module in self._modules:
-            if module not in visited:
-                dfs(module)
-
         return cycles
 
+    def _has_cycle(self, adjacency: list[list[int]]) -> bool:
+        white, gray, black = 0, 1, 2
+        color = bytearray(len(adjacency))
+        for root in range(len(adjacency)):
+            if color[root] != white:
+                continue
+            color[root] = gray
+            work = [(root, iter(adjacency[root]))]
+            while work:
+                node, neighbors = work[-1]
+                for neighbor in neighbors:
+                    if neighbor == node or color[neighbor] == black:
+                        continue
+                    if color[neighbor] == gray:
+                        return True
+                    color[neighbor] = gray
+                    work.append((neighbor, iter(adjacency[neighbor])))
+                    break
+                else:
+                    color[node] = black
+                    work.pop()
+        return False
+
+    def _cycle_through(self, component: list[int], adjacency: list[list[int]]) -> list[str]:
+        names = self._names
+        members = set(component)
+        start = min(component, key=names.__getitem__)
+        parents: dict[int, int] = {}
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            for neighbor in adjacency[node]:
+                if neighbor == start and node != start:
+                    path = [node]
+                    while path[-1] != start:
+                        path.append(parents[path[-1]])
+                    return [names[i] for i in reversed(path)]
+                if neighbor in members and neighbor != start and neighbor not in parents:
+                    parents[neighbor] = node
+                    queue.append(neighbor)
+        return [names[i] for i in component]
+
     def _normalize_cycle(self, nodes: list[str]) -> list[str]:
         if not nodes:
             return nodes
@@ -89,35 +239,43 @@ class DependencyGraph:
     def get_stats(self) -> DependencyStats:
         cycles = self.find_cycles()
 
-        import_counts: dict[str, int] = defaultdict(int)
-        for deps in self._edges.values():
-            for dep in deps:
-                import_counts[dep] += 1
-
-        dep_counts = [(m, len(self._edges.get(m, set()))) for m in self._modules]
-        imp_counts = [(m, import_counts[m]) for m in self._modules if import_counts[m] > 0]
+        names = self._names
+        import_counts = self._import_counts
+        module_ids = self._module_ids()
+        dep_counts = ((names[m], len(self._adj[m])) for m in module_ids)
+        imp_counts = ((names[m], import_counts[m]) for m in module_ids if import_counts[m] > 0)
+        external_imports = sum(
+            count for count, flag in zip(import_counts, self._is_external) if flag
+        )
 
         return DependencyStats(
-            total_modules=len(self._modules),
-            total_imports=sum(len(deps) for deps in self._edges.values()),
-            external_imports=len(self._external),
-            internal_imports=sum(len(deps - self._external) for deps in self._edges.values()),
+            total_modules=self._module_count,
+            total_imports=self._total_imports,
+            external_imports=self._external_count,
+            internal_imports=self._total_imports - external_imports,
             cycles=cycles,
-            most_imported=sorted(imp_counts, key=lambda x: -x[1])[:10],
-            most_dependencies=sorted(dep_counts, key=lambda x: -x[1])[:10],
+            most_imported=heapq.nlargest(10, imp_counts, key=itemgetter(1)),
+            most_dependencies=heapq.nlargest(10, dep_counts, key=itemgetter(1)),
         )
 
     def to_mermaid(self, max_nodes: int = 50) -> str:
         lines = ["graph LR"]
         shown_edges: set[tuple[str, str]] = set()
         node_count = 0
-
-        for module in sorted(self._modules)[:max_nodes]:
-            short_name = Path(module).stem if "/" in module or "\\" in module else module
-            for dep in sorted(self._edges.get(module, set()))[:10]:
-                if dep in self._external:
+        names = self._names
+        short_names = self._short_names
+
+        for node in itertools.islice(self._sorted_modules, max_nodes):
+            short_name = short_names[node]
+            deps = self._adj[node]
+            if len(deps) > 10:
+                first_deps = heapq.nsmallest(10, deps, key=names.__getitem__)
+            else:
+                first_deps = sorted(deps, key=names.__getitem__)
+            for dep_id in first_deps:
+                if self._is_external[dep_id]:
                     continue
-                dep_short = Path(dep).stem if "/" in dep or "\\" in dep else dep
+                dep_short = short_names[dep_id]
                 edge = (short_name, dep_short)
                 if edge not in shown_edges:
                     shown_edges.add(edge)
@@ -132,29 +290,37 @@ class DependencyGraph:
         return "\n".join(lines)
 
 
+FILES_PER_WORKER = 500
+
+
+@functools.cache
+def _shared_extractor() -> "ImportExtractor":
+    from codemapper.processor.imports import ImportExtractor
+    return ImportExtractor()
+
+
+def _extract_imports(file_path: str) -> list[str] | None:
+    try:
+        return [imp.module for imp in _shared_extractor().extract(Path(file_path)).imports]
+    except Exception:
+        return None
+
+
 class ProjectAnalyzer:
     def __init__(self, root: Path) -> None:
         self._root = root
         self._graph = DependencyGraph()
 
     def analyze(self) -> DependencyGraph:
-        from codemapper.processor.imports import ImportExtractor
         from codemapper.utils.gitignore import GitignoreSpec
 
-        extractor = ImportExtractor()
         gitignore = GitignoreSpec(self._root)
         extensions = {".py", ".js", ".ts", ".tsx", ".rs", ".go"}
 
         module_paths: dict[str, Path] = {}
 
-        for file_path in self._root.rglob("*"):
-            if file_path.is_dir():
-                continue
-            if file_path.suffix not in extensions:
-                continue
-            if gitignore.matches(file_path):
-                continue
-
+        for entry in gitignore.walk(extensions):
+            file_path = Path(entry.path)
             try:
                 rel_path = file_path.relative_to(self._root)
                 module_name = str(rel_path)
@@ -163,21 +329,48 @@ class ProjectAnalyzer:
             except ValueError:
                 continue
 
-        for module_name, file_path in module_paths.items():
-            try:
-                module_imports = extractor.extract(file_path)
-                for imp in module_imports.imports:
-                    resolved = self._resolve_import(imp.module, file_path, module_paths)
-                    if resolved:
-                        self._graph.add_dependency(module_name, resolved, is_external=False)
-                    else:
-                        self._graph.add_dependency(module_name, imp.module, is_external=True)
-            except Exception:
+        paths = [str(p) for p in module_paths.values()]
+        workers = min(os.cpu_count() or 1, len(paths) // FILES_PER_WORKER)
+        if workers < 2:
+            results = [_extract_imports(p) for p in paths]
+        else:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+                results = list(executor.map(_extract_imports, paths, chunksize=32))
+
+        by_path, by_stem = self._index_modules(module_paths)
+        for (module_name, file_path), imports in zip(module_paths.items(), results):
+            if imports is None:
                 continue
+            for module in imports:
+                resolved = self._resolve_import(module, file_path, module_paths, by_path, by_stem)
+                if resolved:
+                    self._graph.add_dependency(module_name, resolved, is_external=False)
+                else:
+                    self._graph.add_dependency(module_name, module, is_external=True)
 
         return self._graph
 
-    def _resolve_import(self, import_path: str, from_file: Path, known_modules: dict[str, Path]) -> str | None:
+    @staticmethod
+    def _index_modules(known_modules: dict[str, Path]) -> tuple[dict[str, str], dict[str, str]]:
+        by_path: dict[str, str] = {}
+        by_stem: dict[str, str] = {}
+        for module_path in known_modules:
+            rel = Path(module_path)
+            parts = (*rel.parent.parts, rel.stem)
+            by_stem.setdefault(rel.stem, module_path)
+            for start in range(len(parts)):
+                for end in range(start + 1, len(parts) + 1):
+                    by_path.setdefault("/".join(parts[start:end]), module_path)
+        return by_path, by_stem
+
+    def _resolve_import(
+        self,
+        import_path: str,
+        from_file: Path,
+        known_modules: dict[str, Path],
+        by_path: dict[str, str],
+        by_stem: dict[str, str],
+    ) -> str | None:
         if import_path.startswith("."):
             base_dir = from_file.parent
             parts = import_path.split(".")
@@ -206,11 +399,7 @@ class ProjectAnalyzer:
                 except ValueError:
                     continue
 
-        for module_path in known_modules:
-            module_stem = Path(module_path).stem
-            if module_stem == import_path.split(".")[-1]:
-                return module_path
-            if import_path.replace(".", "/") in module_path:
-                return module_path
-
-        return None
+        resolved = by_path.get(import_path.replace(".", "/"))
+        if resolved is None:
+            resolved = by_stem.get(import_path.rpartition(".")[2])
+        return resolved
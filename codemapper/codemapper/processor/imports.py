@@ -1,4 +1,5 @@
 import re
+from collections.abc import Iterator
 from dataclasses import dataclass, field
 from pathlib import Path
 
@@ -22,6 +23,11 @@ class ModuleImports:
 
 
 class ImportExtractor:
+    _PYTHON_NODES = frozenset({"import_statement", "import_from_statement"})
+    _JS_NODES = frozenset({"import_statement", "call_expression"})
+    _RUST_NODES = frozenset({"use_declaration", "extern_crate_declaration"})
+    _GO_NODES = frozenset({"import_spec"})
+
     def __init__(self) -> None:
         self._parser = CodeParser()
 
@@ -30,29 +36,28 @@ class ImportExtractor:
         if not lang:
             return ModuleImports(path=path)
 
-        content = path.read_text()
         parser = self._parser._get_parser(lang)
         if not parser:
             return ModuleImports(path=path)
 
-        tree = parser.parse(content.encode())
+        tree = parser.parse(path.read_bytes())
         imports: list[Import] = []
 
         if lang == "python":
-            imports = self._extract_python(tree.root_node, content)
+            imports = self._extract_python(tree.root_node)
         elif lang in ("javascript", "typescript", "tsx"):
-            imports = self._extract_js_ts(tree.root_node, content)
+            imports = self._extract_js_ts(tree.root_node)
         elif lang == "rust":
-            imports = self._extract_rust(tree.root_node, content)
+            imports = self._extract_rust(tree.root_node)
         elif lang == "go":
-            imports = self._extract_go(tree.root_node, content)
+            imports = self._extract_go(tree.root_node)
 
         return ModuleImports(path=path, imports=imports)
 
-    def _extract_python(self, root: Node, content: str) -> list[Import]:
+    def _extract_python(self, root: Node) -> list[Import]:
         imports: list[Import] = []
 
-        for node in self._walk(root):
+        for node in self._iter_nodes(root, self._PYTHON_NODES):
             if node.type == "import_statement":
                 for child in node.children:
                     if child.type == "dotted_name" and child.text:
@@ -92,10 +97,10 @@ class ImportExtractor:
 
         return imports
 
-    def _extract_js_ts(self, root: Node, content: str) -> list[Import]:
+    def _extract_js_ts(self, root: Node) -> list[Import]:
         imports: list[Import] = []
 
-        for node in self._walk(root):
+        for node in self._iter_nodes(root, self._JS_NODES):
             if node.type == "import_statement":
                 source_node = node.child_by_field_name("source")
                 if source_node and source_node.text:
@@ -122,10 +127,10 @@ class ImportExtractor:
 
         return imports
 
-    def _extract_rust(self, root: Node, content: str) -> list[Import]:
+    def _extract_rust(self, root: Node) -> list[Import]:
         imports: list[Import] = []
 
-        for node in self._walk(root):
+        for node in self._iter_nodes(root, self._RUST_NODES):
             if node.type == "use_declaration":
                 path_node = None
                 for child in node.children:
@@ -149,32 +154,29 @@ class ImportExtractor:
 
         return imports
 
-    def _extract_go(self, root: Node, content: str) -> list[Import]:
+    def _extract_go(self, root: Node) -> list[Import]:
         imports: list[Import] = []
 
-        for node in self._walk(root):
-            if node.type == "import_declaration":
-                for child in self._walk(node):
-                    if child.type == "interpreted_string_literal" and child.text:
-                        module = child.text.decode().strip('"')
-                        imports.append(Import(
-                            module=module,
-                            line=child.start_point[0] + 1,
-                        ))
-                    elif child.type == "import_spec":
-                        path_node = child.child_by_field_name("path")
-                        alias_node = child.child_by_field_name("name")
-                        if path_node and path_node.text:
-                            imports.append(Import(
-                                module=path_node.text.decode().strip('"'),
-                                alias=alias_node.text.decode() if alias_node and alias_node.text else None,
-                                line=child.start_point[0] + 1,
-                            ))
+        for node in self._iter_nodes(root, self._GO_NODES):
+            path_node = node.child_by_field_name("path")
+            alias_node = node.child_by_field_name("name")
+            if path_node and path_node.text:
+                imports.append(Import(
+                    module=path_node.text.decode().strip('"'),
+                    alias=alias_node.text.decode() if alias_node and alias_node.text else None,
+                    line=node.start_point[0] + 1,
+                ))
 
         return imports
 
-    def _walk(self, node: Node) -> list[Node]:
-        nodes = [node]
-        for child in node.children:
-            nodes.extend(self._walk(child))
-        return nodes
+    def _iter_nodes(self, root: Node, wanted: frozenset[str]) -> Iterator[Node]:
+        cursor = root.walk()
+        while True:
+            node = cursor.node
+            if node is not None and node.type in wanted:
+                yield node
+            if cursor.goto_first_child():
+                continue
+            while not cursor.goto_next_sibling():
+                if not cursor.goto_parent():
+                    return
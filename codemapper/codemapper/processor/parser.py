@@ -1,3 +1,4 @@
+import functools
 from dataclasses import dataclass
 from enum import StrEnum
 from pathlib import Path
@@ -16,6 +17,9 @@ class SymbolKind(StrEnum):
     METHOD = "method"
 
 
+KIND_TITLES: dict[SymbolKind, str] = {kind: kind.value.capitalize() for kind in SymbolKind}
+
+
 @dataclass(frozen=True, slots=True)
 class Symbol:
     name: str
@@ -36,10 +40,21 @@ class CodeParser:
         "rust": ("function_item", "impl_item", "struct_item"),
         "go": ("function_declaration", "method_declaration", "type_declaration"),
     }
+    _EXT_MAP: dict[str, str] = {
+        ".py": "python",
+        ".pyi": "python",
+        ".js": "javascript",
+        ".jsx": "javascript",
+        ".mjs": "javascript",
+        ".ts": "typescript",
+        ".tsx": "tsx",
+        ".rs": "rust",
+        ".go": "go",
+    }
 
     def __init__(self) -> None:
-        self._parsers: dict[str, Parser] = {}
         self._init_languages()
+        self._parsers: dict[str, Parser] = {lang: Parser(language) for lang, language in CodeParser._LANGUAGES.items()}
 
     def _init_languages(self) -> None:
         if not CodeParser._LANGUAGES:
@@ -53,38 +68,25 @@ class CodeParser:
             }
 
     def _get_parser(self, lang: str) -> Parser | None:
-        if lang not in CodeParser._LANGUAGES:
-            return None
-        if lang not in self._parsers:
-            parser = Parser(CodeParser._LANGUAGES[lang])
-            self._parsers[lang] = parser
-        return self._parsers[lang]
-
-    def detect_language(self, path: Path) -> str | None:
-        ext_map = {
-            ".py": "python",
-            ".pyi": "python",
-            ".js": "javascript",
-            ".jsx": "javascript",
-            ".mjs": "javascript",
-            ".ts": "typescript",
-            ".tsx": "tsx",
-            ".rs": "rust",
-            ".go": "go",
-        }
-        return ext_map.get(path.suffix)
-
-    def extract_symbols(self, content: str, lang: str) -> list[Symbol]:
+        return self._parsers.get(lang)
+
+    @staticmethod
+    def detect_language(path: Path) -> str | None:
+        return CodeParser._EXT_MAP.get(path.suffix)
+
+    def extract_symbols(self, content: bytes | str, lang: str) -> list[Symbol]:
         parser = self._get_parser(lang)
         if not parser:
             return []
-        tree = parser.parse(content.encode())
+        if isinstance(content, str):
+            content = content.encode()
+        tree = parser.parse(content)
         node_types = self._QUERIES.get(lang, ())
         symbols: list[Symbol] = []
         self._traverse(tree.root_node, node_types, content, symbols, lang)
         return symbols
 
-    def _traverse(self, node: Node, types: tuple[str, ...], content: str, symbols: list[Symbol], lang: str) -> None:
+    def _traverse(self, node: Node, types: tuple[str, ...], content: bytes, symbols: list[Symbol], lang: str) -> None:
         if node.type in types:
             symbol = self._node_to_symbol(node, content, lang)
             if symbol:
@@ -92,12 +94,12 @@ class CodeParser:
         for child in node.children:
             self._traverse(child, types, content, symbols, lang)
 
-    def _node_to_symbol(self, node: Node, content: str, lang: str) -> Symbol | None:
+    def _node_to_symbol(self, node: Node, content: bytes, lang: str) -> Symbol | None:
         name = self._extract_name(node, lang)
         if not name:
             return None
         kind = self._determine_kind(node.type)
-        code = content[node.start_byte:node.end_byte]
+        code = content[node.start_byte:node.end_byte].decode(errors="replace")
         signature = self._extract_signature(node, content, lang)
         return Symbol(
             name=name,
@@ -130,11 +132,20 @@ class CodeParser:
             return SymbolKind.METHOD
         return SymbolKind.FUNCTION
 
-    def _extract_signature(self, node: Node, content: str, lang: str) -> str:
-        first_line_end = content.find("\n", node.start_byte)
+    def _extract_signature(self, node: Node, content: bytes, lang: str) -> str:
+        first_line_end = content.find(b"\n", node.start_byte)
         if first_line_end == -1:
             first_line_end = node.end_byte
-        sig = content[node.start_byte:first_line_end].strip()
+        sig = content[node.start_byte:first_line_end].decode(errors="replace").strip()
         if lang == "python" and sig.endswith(":"):
             sig = sig[:-1].strip()
         return sig
+
+
+@functools.cache
+def _shared_parser() -> CodeParser:
+    return CodeParser()
+
+
+def extract_symbols(content: bytes | str, lang: str) -> list[Symbol]:
+    return _shared_parser().extract_symbols(content, lang)
@@ -1,4 +1,6 @@
 import asyncio
+import heapq
+import itertools
 from collections.abc import Callable, Awaitable
 from dataclasses import dataclass, field
 from pathlib import Path
@@ -9,49 +11,40 @@ class WorkItem:
     path: Path
     priority: int = 0
 
-    def __lt__(self, other: "WorkItem") -> bool:
-        return self.priority < other.priority
-
 
 class WorkQueue:
     def __init__(self, concurrency: int = 2) -> None:
-        self._queue: asyncio.PriorityQueue[tuple[int, WorkItem]] = asyncio.PriorityQueue()
+        self._heap: list[tuple[int, int, WorkItem]] = []
+        self._counter = itertools.count()
         self._in_progress: set[Path] = set()
         self._concurrency = concurrency
 
     def add(self, path: Path, priority: int = 0) -> None:
         if path not in self._in_progress:
             item = WorkItem(path=path, priority=priority)
-            self._queue.put_nowait((priority, item))
+            heapq.heappush(self._heap, (priority, next(self._counter), item))
 
     async def process(self, handler: Callable[[Path], Awaitable[None]]) -> int:
-        tasks: set[asyncio.Task[None]] = set()
         processed = 0
 
         async def worker() -> None:
             nonlocal processed
-            while True:
-                try:
-                    _, item = self._queue.get_nowait()
-                except asyncio.QueueEmpty:
-                    break
+            while self._heap:
+                _, _, item = heapq.heappop(self._heap)
                 self._in_progress.add(item.path)
                 try:
                     await handler(item.path)
                     processed += 1
                 finally:
                     self._in_progress.discard(item.path)
-                    self._queue.task_done()
-
-        for _ in range(self._concurrency):
-            task = asyncio.create_task(worker())
-            tasks.add(task)
 
-        await asyncio.gather(*tasks)
+        async with asyncio.TaskGroup() as tg:
+            for _ in range(self._concurrency):
+                tg.create_task(worker())
         return processed
 
     def size(self) -> int:
-        return self._queue.qsize()
+        return len(self._heap)
 
     def is_empty(self) -> bool:
-        return self._queue.empty()
+        return not self._heap
@@ -7,18 +7,24 @@ from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 
 
+_INTERVAL_RE = re.compile(r"^every\s+(\d+)\s*([smhd])$", re.IGNORECASE)
+_INTERVAL_UNITS = {"s": "seconds", "m": "minutes", "h": "hours", "d": "days"}
+
+
 def parse_interval(spec: str) -> timedelta | None:
-    match = re.match(r"^every\s+(\d+)\s*(s|m|h|d)$", spec.lower())
+    if spec[:5].lower() != "every":
+        return None
+    match = _INTERVAL_RE.match(spec)
     if not match:
         return None
-    value, unit = int(match.group(1)), match.group(2)
-    units = {"s": "seconds", "m": "minutes", "h": "hours", "d": "days"}
-    return timedelta(**{units[unit]: value})
+    value, unit = int(match.group(1)), match.group(2).lower()
+    return timedelta(**{_INTERVAL_UNITS[unit]: value})
 
 
 def is_cron(spec: str) -> bool:
-    parts = spec.strip().split()
-    return len(parts) == 5 and not spec.startswith("every")
+    if spec.startswith("every"):
+        return False
+    return len(spec.split()) == 5
 
 
 class Scheduler:
@@ -1,9 +1,18 @@
+import asyncio
 import aiosqlite
 import json
+import time
+from collections.abc import AsyncIterator, Sequence
+from contextlib import asynccontextmanager
 from dataclasses import dataclass, asdict
-from datetime import datetime
 from enum import StrEnum
 from pathlib import Path
+from typing import Any
+
+
+SCHEMA_VERSION = 1
+LOG_BATCH_SIZE = 256
+LOG_FLUSH_INTERVAL = 0.05
 
 
 class JobStatus(StrEnum):
@@ -19,8 +28,8 @@ class Codebase:
     name: str
     path: str
     schedule: str
-    created_at: str
-    last_run: str | None = None
+    created_at: int
+    last_run: int | None = None
 
 
 @dataclass
@@ -29,8 +38,8 @@ class Job:
     codebase_id: int
     codebase_name: str
     status: JobStatus
-    started_at: str
-    finished_at: str | None = None
+    started_at: int
+    finished_at: int | None = None
     symbols_processed: int = 0
     files_processed: int = 0
     error: str | None = None
@@ -39,79 +48,235 @@ class Job:
 @dataclass
 class LogEntry:
     job_id: str
-    timestamp: str
+    timestamp: int
     message: str
     level: str = "info"
 
 
+_LEGACY_COLUMNS: dict[str, tuple[tuple[str, ...], tuple[str, ...]]] = {
+    "codebases": (("id", "name", "path", "schedule", "created_at", "last_run"), ("created_at", "last_run")),
+    "jobs": (
+        ("id", "codebase_id", "codebase_name", "status", "started_at", "finished_at",
+         "symbols_processed", "files_processed", "error"),
+        ("started_at", "finished_at"),
+    ),
+    "logs": (("id", "job_id", "timestamp", "message", "level"), ("timestamp",)),
+}
+
+_MIGRATED_TABLES = tuple(name for table in _LEGACY_COLUMNS for name in (table, f"{table}_legacy"))
+
+
+_CODEBASE_COLUMNS = "id, name, path, schedule, created_at, last_run"
+_JOB_COLUMNS = (
+    "id, codebase_id, codebase_name, status, started_at, finished_at, symbols_processed, files_processed, error"
+)
+
+
+_STATUS_MAP: dict[str, JobStatus] = {status.value: status for status in JobStatus}
+
+
+def _row_to_job(row: Sequence[Any]) -> Job:
+    return Job(row[0], row[1], row[2], _STATUS_MAP[row[3]], *row[4:])
+
+
+def _now_ms() -> int:
+    return time.time_ns() // 1_000_000
+
+
 class Store:
+    _SQL_SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS codebases (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE NOT NULL,
+            path TEXT NOT NULL,
+            schedule TEXT NOT NULL,
+            created_at INTEGER NOT NULL,
+            last_run INTEGER
+        )""",
+        """CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            codebase_id INTEGER NOT NULL,
+            codebase_name TEXT NOT NULL,
+            status TEXT NOT NULL,
+            started_at INTEGER NOT NULL,
+            finished_at INTEGER,
+            symbols_processed INTEGER DEFAULT 0,
+            files_processed INTEGER DEFAULT 0,
+            error TEXT,
+            FOREIGN KEY (codebase_id) REFERENCES codebases(id)
+        )""",
+        """CREATE TABLE IF NOT EXISTS logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_id TEXT NOT NULL,
+            timestamp INTEGER NOT NULL,
+            message TEXT NOT NULL,
+            level TEXT DEFAULT 'info',
+            FOREIGN KEY (job_id) REFERENCES jobs(id)
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_jobs_codebase ON jobs(codebase_id)",
+        "CREATE INDEX IF NOT EXISTS idx_jobs_codebase_name ON jobs(codebase_name, started_at)",
+        "CREATE INDEX IF NOT EXISTS idx_jobs_status_started ON jobs(status, started_at DESC)",
+        "CREATE INDEX IF NOT EXISTS idx_jobs_started ON jobs(started_at DESC)",
+        "CREATE INDEX IF NOT EXISTS idx_logs_job_ts ON logs(job_id, timestamp)",
+        "DROP INDEX IF EXISTS idx_logs_job",
+    )
+    _SQL_ADD_CODEBASE = "INSERT OR REPLACE INTO codebases (name, path, schedule, created_at) VALUES (?, ?, ?, ?)"
+    _SQL_ADD_CODEBASE_RETURNING = f"{_SQL_ADD_CODEBASE} RETURNING id"
+    _SQL_GET_CODEBASES = f"SELECT {_CODEBASE_COLUMNS} FROM codebases ORDER BY name"
+    _SQL_GET_CODEBASE_BY_NAME = f"SELECT {_CODEBASE_COLUMNS} FROM codebases WHERE name = ? LIMIT 1"
+    _SQL_REMOVE_CODEBASE = "DELETE FROM codebases WHERE name = ?"
+    _SQL_CREATE_JOB = "INSERT INTO jobs (id, codebase_id, codebase_name, status, started_at) VALUES (?, ?, ?, ?, ?)"
+    _SQL_UPDATE_JOB = (
+        "UPDATE jobs SET status = ?, finished_at = ?, symbols_processed = ?, files_processed = ?, error = ? WHERE id = ?"
+    )
+    _SQL_TOUCH_CODEBASE = (
+        "UPDATE codebases SET last_run = ? FROM jobs WHERE codebases.id = jobs.codebase_id AND jobs.id = ?"
+    )
+    _SQL_GET_JOBS = f"SELECT {_JOB_COLUMNS} FROM jobs ORDER BY started_at DESC LIMIT ?"
+    _SQL_GET_LATEST_JOB = f"SELECT {_JOB_COLUMNS} FROM jobs WHERE codebase_name = ? ORDER BY started_at DESC LIMIT 1"
+    _SQL_GET_RUNNING_JOBS = f"SELECT {_JOB_COLUMNS} FROM jobs WHERE status = ? ORDER BY started_at DESC"
+    _SQL_ADD_LOG = "INSERT INTO logs (job_id, timestamp, message, level) VALUES (?, ?, ?, ?)"
+    _SQL_GET_LOGS = (
+        "SELECT job_id, timestamp, message, level FROM logs WHERE job_id = ? ORDER BY timestamp ASC, id ASC LIMIT ?"
+    )
+
     def __init__(self, db_path: Path | None = None) -> None:
         self._db_path = db_path or Path.home() / ".codemapper" / "mapper.db"
         self._db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._db: aiosqlite.Connection | None = None
+        self._log_queue: asyncio.Queue[tuple[str, int, str, str] | asyncio.Event] = asyncio.Queue()
+        self._log_task: asyncio.Task[None] | None = None
+        self._write_lock = asyncio.Lock()
+        self._dropped_logs = 0
+        self._log_error: str | None = None
+
+    @property
+    def dropped_logs(self) -> int:
+        return self._dropped_logs
+
+    @property
+    def log_error(self) -> str | None:
+        return self._log_error
+
+    @property
+    def _conn(self) -> aiosqlite.Connection:
+        if self._db is None:
+            raise RuntimeError("Store is not initialized")
+        return self._db
 
     async def init(self) -> None:
-        async with aiosqlite.connect(self._db_path) as db:
-            await db.executescript("""
-                CREATE TABLE IF NOT EXISTS codebases (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT UNIQUE NOT NULL,
-                    path TEXT NOT NULL,
-                    schedule TEXT NOT NULL,
-                    created_at TEXT NOT NULL,
-                    last_run TEXT
-                );
-                CREATE TABLE IF NOT EXISTS jobs (
-                    id TEXT PRIMARY KEY,
-                    codebase_id INTEGER NOT NULL,
-                    codebase_name TEXT NOT NULL,
-                    status TEXT NOT NULL,
-                    started_at TEXT NOT NULL,
-                    finished_at TEXT,
-                    symbols_processed INTEGER DEFAULT 0,
-                    files_processed INTEGER DEFAULT 0,
-                    error TEXT,
-                    FOREIGN KEY (codebase_id) REFERENCES codebases(id)
-                );
-                CREATE TABLE IF NOT EXISTS logs (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    job_id TEXT NOT NULL,
-                    timestamp TEXT NOT NULL,
-                    message TEXT NOT NULL,
-                    level TEXT DEFAULT 'info',
-                    FOREIGN KEY (job_id) REFERENCES jobs(id)
-                );
-                CREATE INDEX IF NOT EXISTS idx_jobs_codebase ON jobs(codebase_id);
-                CREATE INDEX IF NOT EXISTS idx_logs_job ON logs(job_id);
-            """)
+        self._db = await aiosqlite.connect(self._db_path)
+        await self._db.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            PRAGMA temp_store=MEMORY;
+            PRAGMA cache_size=-64000;
+            PRAGMA busy_timeout=5000;
+        """)
+        async with self._transaction() as db:
+            legacy = await self._detach_legacy_tables()
+            for statement in self._SQL_SCHEMA:
+                await db.execute(statement)
+            await self._copy_legacy_tables(legacy)
+            await db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._log_task = asyncio.create_task(self._drain_logs())
+
+    @asynccontextmanager
+    async def _transaction(self) -> AsyncIterator[aiosqlite.Connection]:
+        async with self._write_lock:
+            db = self._conn
+            await db.execute("BEGIN IMMEDIATE")
+            try:
+                yield db
+            except BaseException:
+                await db.rollback()
+                raise
             await db.commit()
 
-    async def add_codebase(self, name: str, path: str, schedule: str) -> Codebase:
-        async with aiosqlite.connect(self._db_path) as db:
-            cursor = await db.execute(
-                "INSERT OR REPLACE INTO codebases (name, path, schedule, created_at) VALUES (?, ?, ?, ?)",
-                (name, path, schedule, datetime.now().isoformat())
+    async def _detach_legacy_tables(self) -> list[str]:
+        db = self._conn
+        cursor = await db.execute("PRAGMA user_version")
+        row = await cursor.fetchone()
+        version = row[0] if row else 0
+        if version >= SCHEMA_VERSION:
+            return []
+        cursor = await db.execute(
+            f"SELECT name FROM sqlite_master WHERE type = 'table' AND name IN {_MIGRATED_TABLES}"
+        )
+        tables = {row[0] for row in await cursor.fetchall()}
+        cursor = await db.execute(
+            f"SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL AND tbl_name IN {_MIGRATED_TABLES}"
+        )
+        for (index,) in await cursor.fetchall():
+            await db.execute(f"DROP INDEX {index}")
+        legacy: list[str] = []
+        for table in ("codebases", "jobs", "logs"):
+            if f"{table}_legacy" in tables:
+                legacy.append(table)
+            elif table in tables:
+                await db.execute(f"ALTER TABLE {table} RENAME TO {table}_legacy")
+                legacy.append(table)
+        return legacy
+
+    async def _copy_legacy_tables(self, legacy: list[str]) -> None:
+        db = self._conn
+        for table in ("codebases", "jobs", "logs"):
+            if table not in legacy:
+                continue
+            columns, timestamps = _LEGACY_COLUMNS[table]
+            select = ", ".join(
+                f"CAST(ROUND((julianday({col}, 'utc') - 2440587.5) * 86400000) AS INTEGER)" if col in timestamps else col
+                for col in columns
             )
-            await db.commit()
-            return Codebase(
-                id=cursor.lastrowid or 0,
-                name=name,
-                path=path,
-                schedule=schedule,
-                created_at=datetime.now().isoformat()
+            await db.execute(
+                f"INSERT INTO {table} ({', '.join(columns)}) SELECT {select} FROM {table}_legacy"
             )
+        for table in ("logs", "jobs", "codebases"):
+            if table in legacy:
+                await db.execute(f"DROP TABLE {table}_legacy")
+
+    async def close(self) -> None:
+        if self._log_task and not self._log_task.done():
+            await self._log_queue.join()
+            self._log_task.cancel()
+        self._log_task = None
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
+
+    async def add_codebase(self, name: str, path: str, schedule: str) -> Codebase:
+        created_at = _now_ms()
+        async with self._transaction() as db:
+            cursor = await db.execute(self._SQL_ADD_CODEBASE_RETURNING, (name, path, schedule, created_at))
+            row = await cursor.fetchone()
+        return Codebase(
+            id=row[0] if row else 0,
+            name=name,
+            path=path,
+            schedule=schedule,
+            created_at=created_at
+        )
+
+    async def add_codebases(self, rows: list[tuple[str, str, str]]) -> None:
+        now = _now_ms()
+        async with self._transaction() as db:
+            await db.executemany(self._SQL_ADD_CODEBASE, [(name, path, schedule, now) for name, path, schedule in rows])
 
     async def get_codebases(self) -> list[Codebase]:
-        async with aiosqlite.connect(self._db_path) as db:
-            db.row_factory = aiosqlite.Row
-            cursor = await db.execute("SELECT * FROM codebases ORDER BY name")
-            rows = await cursor.fetchall()
-            return [Codebase(**dict(row)) for row in rows]
+        db = self._conn
+        cursor = await db.execute(self._SQL_GET_CODEBASES)
+        return [Codebase(*row) for row in await cursor.fetchall()]
+
+    async def get_codebase_by_name(self, name: str) -> Codebase | None:
+        db = self._conn
+        cursor = await db.execute(self._SQL_GET_CODEBASE_BY_NAME, (name,))
+        row = await cursor.fetchone()
+        return Codebase(*row) if row else None
 
     async def remove_codebase(self, name: str) -> bool:
-        async with aiosqlite.connect(self._db_path) as db:
-            cursor = await db.execute("DELETE FROM codebases WHERE name = ?", (name,))
-            await db.commit()
-            return cursor.rowcount > 0
+        async with self._transaction() as db:
+            cursor = await db.execute(self._SQL_REMOVE_CODEBASE, (name,))
+        return cursor.rowcount > 0
 
     async def create_job(self, job_id: str, codebase_id: int, codebase_name: str) -> Job:
         job = Job(
@@ -119,62 +284,91 @@ class Store:
             codebase_id=codebase_id,
             codebase_name=codebase_name,
             status=JobStatus.RUNNING,
-            started_at=datetime.now().isoformat()
+            started_at=_now_ms()
         )
-        async with aiosqlite.connect(self._db_path) as db:
+        async with self._transaction() as db:
             await db.execute(
-                "INSERT INTO jobs (id, codebase_id, codebase_name, status, started_at) VALUES (?, ?, ?, ?, ?)",
-                (job.id, job.codebase_id, job.codebase_name, job.status, job.started_at)
+                self._SQL_CREATE_JOB, (job.id, job.codebase_id, job.codebase_name, job.status, job.started_at)
             )
-            await db.commit()
         return job
 
     async def update_job(self, job_id: str, status: JobStatus, symbols: int = 0, files: int = 0, error: str | None = None) -> None:
-        async with aiosqlite.connect(self._db_path) as db:
-            finished = datetime.now().isoformat() if status in (JobStatus.COMPLETED, JobStatus.FAILED) else None
-            await db.execute(
-                "UPDATE jobs SET status = ?, finished_at = ?, symbols_processed = ?, files_processed = ?, error = ? WHERE id = ?",
-                (status, finished, symbols, files, error, job_id)
-            )
-            await db.execute(
-                "UPDATE codebases SET last_run = ? WHERE id = (SELECT codebase_id FROM jobs WHERE id = ?)",
-                (datetime.now().isoformat(), job_id)
-            )
-            await db.commit()
+        now = _now_ms()
+        finished = now if status in (JobStatus.COMPLETED, JobStatus.FAILED) else None
+        async with self._transaction() as db:
+            await db.execute(self._SQL_UPDATE_JOB, (status, finished, symbols, files, error, job_id))
+            await db.execute(self._SQL_TOUCH_CODEBASE, (now, job_id))
 
     async def get_jobs(self, limit: int = 20) -> list[Job]:
-        async with aiosqlite.connect(self._db_path) as db:
-            db.row_factory = aiosqlite.Row
-            cursor = await db.execute(
-                "SELECT * FROM jobs ORDER BY started_at DESC LIMIT ?", (limit,)
-            )
-            rows = await cursor.fetchall()
-            return [Job(**{**dict(row), "status": JobStatus(row["status"])}) for row in rows]
+        db = self._conn
+        cursor = await db.execute(self._SQL_GET_JOBS, (limit,))
+        return [_row_to_job(row) for row in await cursor.fetchall()]
+
+    async def get_latest_job(self, codebase_name: str) -> Job | None:
+        db = self._conn
+        cursor = await db.execute(self._SQL_GET_LATEST_JOB, (codebase_name,))
+        row = await cursor.fetchone()
+        return _row_to_job(row) if row else None
 
     async def get_running_jobs(self) -> list[Job]:
-        async with aiosqlite.connect(self._db_path) as db:
-            db.row_factory = aiosqlite.Row
-            cursor = await db.execute(
-                "SELECT * FROM jobs WHERE status = ? ORDER BY started_at DESC",
-                (JobStatus.RUNNING,)
-            )
-            rows = await cursor.fetchall()
-            return [Job(**{**dict(row), "status": JobStatus(row["status"])}) for row in rows]
+        db = self._conn
+        cursor = await db.execute(self._SQL_GET_RUNNING_JOBS, (JobStatus.RUNNING,))
+        return [_row_to_job(row) for row in await cursor.fetchall()]
 
     async def add_log(self, job_id: str, message: str, level: str = "info") -> None:
-        async with aiosqlite.connect(self._db_path) as db:
-            await db.execute(
-                "INSERT INTO logs (job_id, timestamp, message, level) VALUES (?, ?, ?, ?)",
-                (job_id, datetime.now().isoformat(), message, level)
-            )
-            await db.commit()
+        self._log_queue.put_nowait((job_id, _now_ms(), message, level))
+
+    async def add_logs(self, entries: list[LogEntry]) -> None:
+        for entry in entries:
+            self._log_queue.put_nowait((entry.job_id, entry.timestamp, entry.message, entry.level))
+
+    async def _drain_logs(self) -> None:
+        while True:
+            item = await self._log_queue.get()
+            taken = 1
+            rows: list[tuple[str, int, str, str]] = []
+            flushed: asyncio.Event | None = None
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + LOG_FLUSH_INTERVAL
+            while True:
+                if isinstance(item, asyncio.Event):
+                    flushed = item
+                    break
+                rows.append(item)
+                if len(rows) >= LOG_BATCH_SIZE:
+                    break
+                try:
+                    item = self._log_queue.get_nowait()
+                    taken += 1
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._log_queue.get(), remaining)
+                    taken += 1
+                except TimeoutError:
+                    break
+            try:
+                if rows:
+                    async with self._transaction() as db:
+                        await db.executemany(self._SQL_ADD_LOG, rows)
+            except aiosqlite.Error as e:
+                self._dropped_logs += len(rows)
+                self._log_error = str(e)
+            finally:
+                if flushed:
+                    flushed.set()
+                for _ in range(taken):
+                    self._log_queue.task_done()
 
     async def get_logs(self, job_id: str, limit: int = 100) -> list[LogEntry]:
-        async with aiosqlite.connect(self._db_path) as db:
-            db.row_factory = aiosqlite.Row
-            cursor = await db.execute(
-                "SELECT job_id, timestamp, message, level FROM logs WHERE job_id = ? ORDER BY timestamp ASC LIMIT ?",
-                (job_id, limit)
-            )
-            rows = await cursor.fetchall()
-            return [LogEntry(**dict(row)) for row in rows]
+        if self._log_task and not self._log_task.done():
+            flushed = asyncio.Event()
+            self._log_queue.put_nowait(flushed)
+            await flushed.wait()
+        db = self._conn
+        cursor = await db.execute(self._SQL_GET_LOGS, (job_id, limit))
+        return [LogEntry(*row) for row in await cursor.fetchall()]
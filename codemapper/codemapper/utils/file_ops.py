@@ -1,22 +1,52 @@
+import os
 from pathlib import Path
 
 
+MAP_PATH_CACHE_SIZE = 8192
+
+
 class ShadowFS:
     def __init__(self, root: Path, output_dir: str = "maps") -> None:
         self._root = root
+        self._root_str = str(root).rstrip(os.sep) + os.sep
         self._maps_dir = root / output_dir
+        self._map_paths: dict[str, Path] = {}
+        self._created_dirs: set[Path] = set()
+
+    def source_to_map_path(self, source: Path | str) -> Path:
+        source_str = str(source)
+        map_path = self._map_paths.get(source_str)
+        if map_path is not None:
+            return map_path
+        if source_str.startswith(self._root_str):
+            map_path = self._maps_dir / f"{source_str[len(self._root_str):]}.md"
+        else:
+            try:
+                relative = Path(source).relative_to(self._root)
+            except ValueError:
+                relative = source
+            map_path = self._maps_dir / f"{relative}.md"
+        if len(self._map_paths) >= MAP_PATH_CACHE_SIZE:
+            del self._map_paths[next(iter(self._map_paths))]
+        self._map_paths[source_str] = map_path
+        return map_path
+
+    def _ensure_dir(self, directory: Path) -> None:
+        if directory not in self._created_dirs:
+            directory.mkdir(parents=True, exist_ok=True)
+            self._created_dirs.add(directory)
 
-    def source_to_map_path(self, source: Path) -> Path:
+    def _write(self, map_path: Path, content: str) -> None:
         try:
-            relative = source.relative_to(self._root)
-        except ValueError:
-            relative = source
-        return self._maps_dir / f"{relative}.md"
+            map_path.write_text(content)
+        except FileNotFoundError:
+            map_path.parent.mkdir(parents=True, exist_ok=True)
+            map_path.write_text(content)
 
     def write_map(self, source: Path, content: str) -> Path:
         map_path = self.source_to_map_path(source)
-        map_path.parent.mkdir(parents=True, exist_ok=True)
-        map_path.write_text(content)
+        self._ensure_dir(map_path.parent)
+        self._write(map_path, content)
         return map_path
 
     def read_map(self, source: Path) -> str | None:
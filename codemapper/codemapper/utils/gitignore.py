@@ -1,27 +1,74 @@
+import functools
+import os
+from collections.abc import Collection, Iterator
 from pathlib import Path
 
 import pathspec
 
 
+_SPEC_CACHE: dict[str, tuple[int, pathspec.PathSpec]] = {}
+
+
 class GitignoreSpec:
     def __init__(self, root: Path) -> None:
         self._root = root
+        self._root_str = str(root).rstrip(os.sep) + os.sep
         self._spec = self._load_gitignore()
+        self._match = functools.lru_cache(maxsize=65536)(self._spec.match_file)
 
     def _load_gitignore(self) -> pathspec.PathSpec:
         gitignore_path = self._root / ".gitignore"
+        try:
+            mtime_ns = gitignore_path.stat().st_mtime_ns
+        except OSError:
+            mtime_ns = 0
+        key = str(self._root)
+        cached = _SPEC_CACHE.get(key)
+        if cached is not None and cached[0] == mtime_ns:
+            return cached[1]
         patterns: list[str] = []
-        if gitignore_path.exists():
+        if mtime_ns:
             patterns = gitignore_path.read_text().splitlines()
         patterns.extend([".git/", "__pycache__/", "*.pyc", ".venv/", "node_modules/", ".maps/"])
-        return pathspec.PathSpec.from_lines("gitwildmatch", patterns)
+        spec = pathspec.PathSpec.from_lines("gitwildmatch", patterns)
+        _SPEC_CACHE[key] = (mtime_ns, spec)
+        return spec
 
-    def matches(self, path: Path) -> bool:
+    def _relative(self, path: Path | str) -> str | None:
+        path_str = str(path)
+        if path_str.startswith(self._root_str):
+            return path_str[len(self._root_str):]
         try:
-            relative = path.relative_to(self._root)
-            return self._spec.match_file(str(relative))
+            return str(Path(path).relative_to(self._root))
         except ValueError:
-            return False
+            return None
+
+    def matches(self, path: Path | str) -> bool:
+        relative = self._relative(path)
+        return relative is not None and self._match(relative)
+
+    def matches_dir(self, path: Path | str) -> bool:
+        relative = self._relative(path)
+        return relative is not None and self._match(f"{relative}/")
+
+    def walk(self, extensions: Collection[str] | None = None) -> Iterator[os.DirEntry[str]]:
+        stack = [str(self._root)]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            if not self.matches_dir(entry.path):
+                                stack.append(entry.path)
+                            continue
+                        if not entry.is_file():
+                            continue
+                        if extensions is not None and os.path.splitext(entry.name)[1] not in extensions:
+                            continue
+                        if not self.matches(entry.path):
+                            yield entry
+            except OSError:
+                continue
 
     def filter_paths(self, paths: list[Path]) -> list[Path]:
         return [p for p in paths if not self.matches(p)]
@@ -1,12 +1,23 @@
+import os
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
 from pathlib import Path
 from typing import Callable
 
 from watchdog.observers import Observer
+from watchdog.observers.api import BaseObserver
+from watchdog.observers.polling import PollingObserver
 from watchdog.events import FileSystemEventHandler, FileModifiedEvent, FileCreatedEvent
 
 from codemapper.utils.gitignore import GitignoreSpec
 
 
+DEBOUNCE_SECONDS = 0.2
+POLL_TIMEOUT = 2.0
+CALLBACK_WORKERS = 4
+_ALWAYS_IGNORED = tuple(f"{os.sep}{name}{os.sep}" for name in (".git", "node_modules", "__pycache__", ".venv"))
+
+
 class CodeEventHandler(FileSystemEventHandler):
     def __init__(
         self,
@@ -14,28 +25,59 @@ class CodeEventHandler(FileSystemEventHandler):
         gitignore: GitignoreSpec,
         extensions: set[str],
         on_change: Callable[[Path], None],
+        executor: Executor | None = None,
     ) -> None:
         self._root = root
+        self._root_str = str(root).rstrip(os.sep) + os.sep
         self._gitignore = gitignore
-        self._extensions = extensions
+        self._extensions = frozenset(extensions)
         self._on_change = on_change
+        self._executor = executor
+        self._pending: dict[str, threading.Timer] = {}
+        self._lock = threading.Lock()
 
     def on_modified(self, event: FileModifiedEvent) -> None:  # type: ignore[override]
         if event.is_directory:
             return
-        self._handle_event(Path(str(event.src_path)))
+        self._handle_event(str(event.src_path))
 
     def on_created(self, event: FileCreatedEvent) -> None:  # type: ignore[override]
         if event.is_directory:
             return
-        self._handle_event(Path(str(event.src_path)))
+        self._handle_event(str(event.src_path))
 
-    def _handle_event(self, path: Path) -> None:
-        if path.suffix not in self._extensions:
+    def _handle_event(self, src: str) -> None:
+        dot = src.rfind(".")
+        if dot <= src.rfind(os.sep) + 1 or src[dot:] not in self._extensions:
+            return
+        relative = src[len(self._root_str) - 1:] if src.startswith(self._root_str) else src
+        if any(fragment in relative for fragment in _ALWAYS_IGNORED):
             return
-        if self._gitignore.matches(path):
+        if self._gitignore.matches(src):
             return
-        self._on_change(path)
+        timer = threading.Timer(DEBOUNCE_SECONDS, self._fire, (src,))
+        timer.daemon = True
+        with self._lock:
+            previous = self._pending.get(src)
+            self._pending[src] = timer
+        if previous:
+            previous.cancel()
+        timer.start()
+
+    def _fire(self, src: str) -> None:
+        with self._lock:
+            self._pending.pop(src, None)
+        if self._executor is None:
+            self._on_change(Path(src))
+        else:
+            self._executor.submit(self._on_change, Path(src))
+
+    def cancel_pending(self) -> None:
+        with self._lock:
+            pending = list(self._pending.values())
+            self._pending.clear()
+        for timer in pending:
+            timer.cancel()
 
 
 class CodeWatcher:
@@ -47,16 +89,24 @@ class CodeWatcher:
         on_change: Callable[[Path], None],
     ) -> None:
         self._root = root
-        self._handler = CodeEventHandler(root, gitignore, extensions, on_change)
-        self._observer = Observer()
+        self._executor = ThreadPoolExecutor(max_workers=CALLBACK_WORKERS, thread_name_prefix="codemapper-watch")
+        self._handler = CodeEventHandler(root, gitignore, extensions, on_change, self._executor)
+        self._observer: BaseObserver = Observer()
 
     def start(self) -> None:
-        self._observer.schedule(self._handler, str(self._root), recursive=True)
-        self._observer.start()
+        try:
+            self._observer.schedule(self._handler, str(self._root), recursive=True)
+            self._observer.start()
+        except OSError:
+            self._observer = PollingObserver(timeout=POLL_TIMEOUT)
+            self._observer.schedule(self._handler, str(self._root), recursive=True)
+            self._observer.start()
 
     def stop(self) -> None:
         self._observer.stop()
         self._observer.join()
+        self._handler.cancel_pending()
+        self._executor.shutdown(wait=True)
 
     def is_alive(self) -> bool:
         return self._observer.is_alive()